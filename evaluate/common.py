@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers shared by run_model.py, evaluate_model.py and metric_calc.py.
+
+The scripts are run from this directory, so they import this module
+directly (`from common import ...`).
+"""
+
+import asyncio
+import codecs
+import contextlib
+import json
+import os
+from collections import deque
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Deque, Iterator, List, TextIO, Tuple
+
+try:
+    import ijson  # optional: stream large JSON files
+except ImportError:  # pragma: no cover - fall back to json.loads
+    ijson = None
+
+
+# Seconds between status checks of a submitted Batch API job.
+BATCH_POLL_INTERVAL = 60
+
+# Batch API statuses after which a batch will not progress any further.
+BATCH_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class RequestThrottle:
+    """
+    Bound API requests by concurrency, requests/minute and tokens/minute.
+
+    Requests and their token counts are tracked over a sliding 60s window.
+    A request first takes a concurrency slot and is then counted in the
+    window at the moment it is sent, waiting only when sending it now
+    would exceed either limit. Its token count is estimated up front and
+    corrected from `response.usage` via `record_usage`.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_rpm: int,
+        max_tpm: int,
+        window: float = 60.0,
+    ) -> None:
+        self.max_rpm = max_rpm
+        self.max_tpm = max_tpm
+        self.window = window
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._lock = asyncio.Lock()
+        # [start_time, tokens] per request in the current window.
+        self._entries: Deque[List[float]] = deque()
+        self._tokens_in_window = 0.0
+
+    def _evict(self, now: float) -> None:
+        while self._entries and now - self._entries[0][0] >= self.window:
+            _, tokens = self._entries.popleft()
+            self._tokens_in_window -= tokens
+
+    async def _reserve(self, estimated_tokens: int) -> List[float]:
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                now = loop.time()
+                self._evict(now)
+                fits_tpm = (
+                    self._tokens_in_window + estimated_tokens <= self.max_tpm
+                    # A single oversized request still goes through alone.
+                    or not self._entries
+                )
+                if len(self._entries) < self.max_rpm and fits_tpm:
+                    entry = [now, float(estimated_tokens)]
+                    self._entries.append(entry)
+                    self._tokens_in_window += estimated_tokens
+                    return entry
+                await asyncio.sleep(self._entries[0][0] + self.window - now)
+
+    @contextlib.asynccontextmanager
+    async def request(self, estimated_tokens: int) -> AsyncIterator[List[float]]:
+        """Hold a concurrency slot, then wait until the request fits the limits."""
+        async with self._semaphore:
+            # Reserved inside the slot so the entry's time is the real send time.
+            yield await self._reserve(estimated_tokens)
+
+    def record_usage(self, reservation: List[float], total_tokens: int) -> None:
+        """Replace a reservation's estimated token count with the actual one."""
+        if reservation in self._entries:
+            self._tokens_in_window += total_tokens - reservation[1]
+        reservation[1] = float(total_tokens)
+
+
+async def wait_for_batch(client: Any, batch_id: str, prefix: str) -> Any:
+    """
+    Poll a Batch API job until it reaches a final status and return it.
+
+    Progress lines are printed as "<prefix><batch_id>: <status> (<done>/<total> done)".
+    """
+    while True:
+        batch = await client.batches.retrieve(batch_id)
+        if batch.status in BATCH_FINAL_STATUSES:
+            return batch
+        counts = batch.request_counts
+        progress = f" ({counts.completed}/{counts.total} done)" if counts else ""
+        print(f"{prefix}{batch_id}: {batch.status}{progress}")
+        await asyncio.sleep(BATCH_POLL_INTERVAL)
+
+
+def open_jsonl_log(path: Path, append: bool) -> TextIO:
+    """
+    Open an append-only JSONL log, truncated unless `append` is set.
+
+    When appending, a final line left without its newline by a crash is
+    cut off first, so the next record starts on a line of its own instead
+    of being merged into the broken one.
+    """
+    if not append or not path.exists():
+        return path.open("w", encoding="utf-8")
+
+    with path.open("rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end:
+            f.seek(end - 1)
+            if f.read(1) != b"\n":
+                # Scan back to the last complete line and drop what follows.
+                pos = end
+                while pos > 0:
+                    step = min(4096, pos)
+                    pos -= step
+                    f.seek(pos)
+                    newline = f.read(step).rfind(b"\n")
+                    if newline != -1:
+                        pos += newline + 1
+                        break
+                f.truncate(pos)
+                print(f"Warning: dropped an incomplete last line from {path}")
+    return path.open("a", encoding="utf-8")
+
+
+def _seek_json_root(f: BinaryIO) -> bytes:
+    """
+    Move `f` to the first byte of its JSON root and return that byte.
+
+    A UTF-8 BOM and any amount of leading whitespace are skipped; an empty
+    or blank file returns b"".
+    """
+    if f.read(len(codecs.BOM_UTF8)) != codecs.BOM_UTF8:
+        f.seek(0)
+    while True:
+        chunk = f.read(4096)
+        if not chunk:
+            return b""
+        rest = chunk.lstrip(b" \t\r\n")
+        if rest:
+            f.seek(-len(rest), os.SEEK_CUR)
+            return rest[:1]
+
+
+def iter_json_root(file_path: Path, allow_dict: bool = False) -> Iterator[Tuple[Any, Any]]:
+    """
+    Yield (key, value) pairs from a JSON file whose root is a list.
+
+    List items are yielded with key None; with `allow_dict`, a dict root is
+    accepted too and yields its items. Any other root raises TypeError.
+    Uses `ijson` when installed, so only one entry is resident at a time;
+    otherwise the whole file is loaded at once.
+    """
+    expected = "list or dict" if allow_dict else "list"
+    if ijson is None:
+        data = json.loads(file_path.read_bytes())
+        if isinstance(data, list):
+            yield from ((None, item) for item in data)
+        elif allow_dict and isinstance(data, dict):
+            yield from data.items()
+        else:
+            raise TypeError(f"Expected {expected} at root of {file_path}, got {type(data)}")
+        return
+
+    with file_path.open("rb") as f:
+        root = _seek_json_root(f)
+        if root == b"[":
+            yield from ((None, item) for item in ijson.items(f, "item", use_float=True))
+        elif allow_dict and root == b"{":
+            yield from ijson.kvitems(f, "", use_float=True)
+        else:
+            raise TypeError(f"Expected {expected} at root of {file_path}, got {root!r}")
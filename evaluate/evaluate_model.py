@@ -24,27 +24,68 @@ Output file:
                     "points": 10,
                     "score": 1,               # 0 or 1
                     "weighted_score": 10      # points * score
+                    # "evaluator_error": true  # only if the evaluator call
+                    #                          # failed (scored 0)
                 },
                 ...
             }
         }
+    - While running, progress is appended to sidecar files next to the
+      output (`<output>.partial.jsonl` per case, `<output>.jsonl` per rubric
+      item). `--resume` reads them; they are removed once the final JSON is
+      written. `--resume` also regrades cases with an `evaluator_error` item.
+      With `--mode batch`, the submitted batch id is kept in
+      `<output>.batch.json` until its verdicts are saved.
 """
 
 import argparse
+import asyncio
+import hashlib
 import json
 import os
 import re
-import time
+import sqlite3
+import string
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import (
+    Any,
+    Awaitable,
+    Dict,
+    List,
+    Set,
+    Tuple,
+    Union,
+)
 
-from openai import OpenAI
+from openai import AsyncOpenAI
+
+from common import RequestThrottle, iter_json_root, open_jsonl_log, wait_for_batch
 
 
 # Fixed evaluator model for LiveMedBench
 EVALUATOR_MODEL = "gpt-4.1-2025-04-14"
 EVALUATOR_MODEL_DISPLAY = "gpt-4.1"
 
+# Default number of evaluator requests allowed in flight at once.
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Default evaluator rate limits (OpenAI tier 1 limits for gpt-4.1).
+DEFAULT_MAX_RPM = 500
+DEFAULT_MAX_TPM = 30_000
+
+
+# Default number of rubric criteria graded together in one evaluator call.
+DEFAULT_CRITERIA_PER_CALL = 8
+
+# Completion-token budget of an evaluator call: a fixed allowance for the
+# {"results": [...]} wrapper plus one {"id": ..., "met": ...} per criterion.
+MAX_COMPLETION_TOKENS_BASE = 16
+MAX_COMPLETION_TOKENS_PER_CRITERION = 24
+
+
+# Default on-disk cache of evaluator verdicts, shared across runs.
+DEFAULT_CACHE_FILE = ".eval_cache/evaluator_cache.sqlite3"
+
 
 EVALUATION_PROMPT = """
 Role: You are an Objective Grader.
@@ -52,10 +93,11 @@ Task: Evaluate the Model Response (M_out) against the provided Rubric (R).
 
 Instructions:
 - Objective Verification: For each criterion in the Rubric, determine if the Model Response satisfies it.
+- Independent Judgment: Judge every criterion on its own; do not let one criterion influence another.
 - Binary Judgment: Return true (Met) or false (Not Met).
 - Positive Criteria Logic: true if the model includes the required information.
 - Negative Criteria Logic: true if the model commits the error (e.g., if the rubric asks "Does model suggest antibiotics?" and the model suggests them, return true). Note: The scoring formula handles the negative sign; you simply detect presence.
-- Evidence: Quote the specific sentence from the model output that supports your decision.
+- Verdict Only: Output only the verdicts; do not include quotes, reasoning or any other text.
 
 Input:
 - User Query (Q): This is the original question from the patient, built as:
@@ -63,31 +105,30 @@ Input:
 - Model Response (M_out):
 {model_response}
 
-- Rubric (R): JSON list of criteria from Phase 1. In this call you will receive exactly one criterion:
-[
-  {{"question": "{criterion}"}}
-]
+- Rubric (R): JSON list of criteria from Phase 1, each with a numeric "id":
+{criteria}
 
-Output Format (JSON):
-[
-  {{
-    "question": "Does the model identify the likely cause as Norovirus?",
-    "met": true,
-    "reasoning": "Model explicitly states 'symptoms suggest Norovirus'."
-  }},
-  {{
-    "question": "Does the model recommend antibiotics?",
-    "met": false,
-    "reasoning": "Model correctly states 'antibiotics are not effective'."
-  }}
-]
+Output Format (compact JSON):
+{{"results": [{{"id": 1, "met": true}}, {{"id": 2, "met": false}}]}}
 
-Now, given the User Query (Q), the Model Response (M_out) and the Rubric (R) with one criterion, output a JSON list with a single object in the exact format above, where:
-- "question" is the criterion string you evaluated,
-- "met" is true or false,
-- "reasoning" briefly quotes or summarizes the evidence from the model response (and, if relevant, the user query) that supports your decision.
+Now, given the User Query (Q), the Model Response (M_out) and the Rubric (R), output a JSON object whose "results" list has exactly one object per criterion in R, in the same order, in the exact format above, where:
+- "id" is the id of the criterion you evaluated,
+- "met" is true or false.
 """
 
+# EVALUATION_PROMPT parsed once into (literal_text, field_name) pairs, so
+# filling it per batch is a join instead of a fresh str.format parse.
+EVALUATION_PROMPT_PARTS: List[Tuple[str, str | None]] = [
+    (literal_text, field_name)
+    for literal_text, field_name, _, _ in string.Formatter().parse(EVALUATION_PROMPT)
+]
+
+# Fallbacks for evaluator answers that are not valid JSON.
+VERDICT_RE = re.compile(
+    r'"id"\s*:\s*"?(\d+)"?\s*,\s*"met"\s*:\s*"?(true|false)', re.IGNORECASE
+)
+MET_RE = re.compile(r'"met"\s*:\s*"?(true|false)', re.IGNORECASE)
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -128,10 +169,68 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="If set, resume from an existing output file (by case_id).",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help=(
+            "Maximum number of evaluator requests in flight at once. "
+            "Size this to your OpenAI rate limits."
+        ),
+    )
+    parser.add_argument(
+        "--max-rpm",
+        type=int,
+        default=DEFAULT_MAX_RPM,
+        help="Maximum evaluator requests per minute.",
+    )
+    parser.add_argument(
+        "--max-tpm",
+        type=int,
+        default=DEFAULT_MAX_TPM,
+        help="Maximum evaluator tokens (prompt + completion) per minute.",
+    )
+    parser.add_argument(
+        "--criteria-per-call",
+        type=int,
+        default=DEFAULT_CRITERIA_PER_CALL,
+        help=(
+            "Number of rubric criteria graded together in one evaluator call "
+            "(1 grades each criterion separately)."
+        ),
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=str,
+        default=DEFAULT_CACHE_FILE,
+        help="Path to the SQLite cache of evaluator verdicts.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="If set, neither read nor write the evaluator verdict cache.",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=("live", "batch"),
+        default="live",
+        help=(
+            "live: call the evaluator directly. batch: submit all pending "
+            "criteria through the OpenAI Batch API (half price, up to 24h "
+            "turnaround) and wait for the results."
+        ),
+    )
+    args = parser.parse_args()
+    if args.max_concurrency < 1:
+        parser.error("--max-concurrency must be at least 1")
+    if args.max_rpm < 1 or args.max_tpm < 1:
+        parser.error("--max-rpm and --max-tpm must be at least 1")
+    if args.criteria_per_call < 1:
+        parser.error("--criteria-per-call must be at least 1")
+    return args
 
 
-def init_client() -> OpenAI:
+def init_client() -> AsyncOpenAI:
     """Initialize OpenAI client from environment variable."""
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
@@ -139,7 +238,105 @@ def init_client() -> OpenAI:
             "OPENAI_API_KEY is not set. Please export your key before running:\n"
             "  export OPENAI_API_KEY='sk-...'"
         )
-    return OpenAI(api_key=api_key)
+    return AsyncOpenAI(api_key=api_key)
+
+
+class EvaluatorCache:
+    """
+    SQLite-backed cache of evaluator verdicts.
+
+    Each verdict is keyed by a SHA-256 of (evaluator model, criterion,
+    model response, user query), so re-runs and resumed runs skip the API
+    for any criterion that was already graded against the same response.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, score INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(criterion: str, model_response: str, user_query: str) -> str:
+        payload = "\x00".join(
+            (
+                EVALUATOR_MODEL,
+                criterion.strip(),
+                (model_response or "").strip(),
+                (user_query or "").strip(),
+            )
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> int | None:
+        row = self._conn.execute(
+            "SELECT score FROM verdicts WHERE key = ?", (key,)
+        ).fetchone()
+        return None if row is None else int(row[0])
+
+    def set_many(self, verdicts: Dict[str, int]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO verdicts (key, score) VALUES (?, ?)",
+            verdicts.items(),
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def load_jsonl_file(file_path: Path) -> List[Dict[str, Any]]:
+    """Load a JSONL file, skipping lines that are not complete JSON objects."""
+    entries: List[Dict[str, Any]] = []
+    with file_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A crash can leave a truncated final line.
+                continue
+    return entries
+
+
+class RubricItemLog:
+    """
+    Append-only JSONL log of graded rubric items.
+
+    Each line records one (case_id, rubric_idx, criterion, score). A
+    resumed run reloads the log so items graded before an interruption are
+    not re-sent, even when their case never finished.
+    """
+
+    def __init__(self, path: Path, resume: bool = False) -> None:
+        self.path = path
+        self._scores: Dict[Tuple[str, str], int] = {}
+        if resume and path.exists():
+            for entry in load_jsonl_file(path):
+                key = (str(entry["case_id"]), entry["criterion"])
+                self._scores[key] = int(entry["score"])
+        self._fh = open_jsonl_log(path, append=resume)
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def get(self, case_id: Any, criterion: str) -> int | None:
+        return self._scores.get((str(case_id), criterion))
+
+    def append(self, case_id: Any, rubric_idx: int, criterion: str, score: int) -> None:
+        self._scores[(str(case_id), criterion)] = score
+        entry = {
+            "case_id": case_id,
+            "rubric_idx": rubric_idx,
+            "criterion": criterion,
+            "score": score,
+        }
+        self._fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
 
 
 def load_json_file(file_path: Path) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
@@ -147,174 +344,581 @@ def load_json_file(file_path: Path) -> Union[List[Dict[str, Any]], Dict[str, Any
         return json.load(f)
 
 
+def extract_model_response(model_case: Dict[str, Any], response_field: str) -> str:
+    """Return the model's response text from one model result record."""
+    model_response = model_case.get(response_field, "") or ""
+    if not model_response and response_field != "response":
+        # Fallback to 'response' if needed
+        model_response = model_case.get("response", "") or ""
+    return str(model_response)
+
+
+def result_case_id(key: Any, model_case: Dict[str, Any]) -> Any:
+    """case_id of a model result record; dict-root records fall back to their key."""
+    if key is None:
+        return model_case.get("case_id")
+    return model_case.get("case_id") or key
+
+
 def load_model_results(
     model_result_file: Path,
     response_field: str,
-) -> Dict[str, Any]:
+) -> Dict[str, str]:
     """
-    Load model results and index them by case_id.
+    Load model responses and index them by case_id.
 
-    Supports both list and dict formats.
+    Supports both list and dict formats: list items are indexed by their
+    case_id, dict values by their case_id or else their key. Only the
+    response text of each record is kept, so the rest of the (often large)
+    result file is never held in memory. A missing or malformed file raises
+    instead of silently producing empty evaluations.
     """
-    if not model_result_file.exists():
-        print(f"⚠️ Model result file does not exist: {model_result_file}")
-        return {}
-
     print(f"Loading model results from: {model_result_file}")
-    try:
-        data = load_json_file(model_result_file)
-        model_dict: Dict[str, Any] = {}
+    model_dict = {
+        str(case_id): extract_model_response(item, response_field)
+        for key, item in iter_json_root(model_result_file, allow_dict=True)
+        if isinstance(item, dict)
+        and (case_id := result_case_id(key, item)) is not None
+    }
+    print(f"  ✓ Loaded {len(model_dict)} cases from model results.")
+    return model_dict
 
-        if isinstance(data, list):
-            for item in data:
-                if not isinstance(item, dict):
-                    continue
-                case_id = item.get("case_id")
-                if case_id is not None:
-                    model_dict[str(case_id)] = item
 
-        elif isinstance(data, dict):
-            for k, v in data.items():
-                if isinstance(v, dict):
-                    case_id = v.get("case_id") or k
-                    model_dict[str(case_id)] = v
+def create_evaluation_prompt(
+    criteria: List[str],
+    model_response: str,
+    user_query: str,
+) -> str:
+    """Fill the evaluation prompt template with criteria numbered from 1."""
+    numbered = [
+        {"id": i, "question": criterion.strip()}
+        for i, criterion in enumerate(criteria, 1)
+    ]
+    fields = {
+        "criteria": json.dumps(numbered, ensure_ascii=False, indent=2),
+        "model_response": (model_response or "").strip(),
+        "user_query": (user_query or "").strip(),
+    }
+    return "".join(
+        literal_text + (fields[field_name] if field_name is not None else "")
+        for literal_text, field_name in EVALUATION_PROMPT_PARTS
+    )
 
-        else:
-            raise TypeError(f"Unsupported JSON root type: {type(data)}")
 
-        print(f"  ✓ Loaded {len(model_dict)} cases from model results.")
-        return model_dict
+def parse_met(met: Any) -> int | None:
+    """Convert a "met" value (bool or "true"/"false") to 1/0, else None."""
+    if isinstance(met, bool):
+        return 1 if met else 0
+    if isinstance(met, str):
+        lowered = met.strip().lower()
+        if lowered == "true":
+            return 1
+        if lowered == "false":
+            return 0
+    return None
 
-    except Exception as e:  # noqa: BLE001
-        print(f"  ✗ Failed to load model results: {e}")
-        return {}
 
+def parse_evaluator_output(text: str, num_criteria: int) -> Dict[int, int] | None:
+    """
+    Parse the evaluator's {"results": [...]} answer into {id: 0/1}.
 
-def create_evaluation_prompt(
-    criterion: str,
-    model_response: str,
-    user_query: str,
-) -> str:
-    """Fill the evaluation prompt template."""
-    return EVALUATION_PROMPT.format(
-        criterion=criterion.strip(),
-        model_response=(model_response or "").strip(),
-        user_query=(user_query or "").strip(),
+    Falls back to scanning for "id"/"met" pairs when the answer is not
+    valid JSON (e.g. truncated). Returns None unless every id in
+    1..num_criteria received a verdict.
+    """
+    verdicts: Dict[int, int] = {}
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        parsed = None
+    if isinstance(parsed, dict):
+        parsed = parsed.get("results")
+
+    if isinstance(parsed, list):
+        for entry in parsed:
+            if not isinstance(entry, dict):
+                continue
+            met = parse_met(entry.get("met"))
+            try:
+                item_id = int(entry.get("id", 1 if num_criteria == 1 else 0))
+            except (TypeError, ValueError):
+                continue
+            if met is not None and 1 <= item_id <= num_criteria:
+                verdicts[item_id] = met
+    else:
+        for m in VERDICT_RE.finditer(text):
+            item_id = int(m.group(1))
+            if 1 <= item_id <= num_criteria:
+                verdicts[item_id] = 1 if m.group(2).lower() == "true" else 0
+
+    if len(verdicts) != num_criteria:
+        return None
+    return verdicts
+
+
+def parse_single_verdict_heuristic(text: str) -> int:
+    """Best-effort 0/1 from a non-JSON answer about a single criterion."""
+    m = MET_RE.search(text)
+    if m:
+        return 1 if m.group(1).lower() == "true" else 0
+
+    # Final fallback heuristics similar to yes/no.
+    lowered_text = text.lower()
+    if "yes" in lowered_text or "satisf" in lowered_text:
+        return 1
+    if "no" in lowered_text or "not satisf" in lowered_text:
+        return 0
+
+    print(
+        f"⚠️ Could not parse evaluator output, defaulting to 0. "
+        f"Raw output: {text[:160]!r}"
     )
+    return 0
+
+
+def completion_token_budget(num_criteria: int) -> int:
+    """max_completion_tokens for an evaluator call grading `num_criteria` criteria."""
+    return MAX_COMPLETION_TOKENS_BASE + MAX_COMPLETION_TOKENS_PER_CRITERION * num_criteria
 
 
-def call_gpt_evaluator(
-    client: OpenAI,
+def build_evaluator_request(prompt: str, max_completion_tokens: int) -> Dict[str, Any]:
+    """Chat-completions request body for one evaluator call."""
+    return {
+        "model": EVALUATOR_MODEL,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt,
+            }
+        ],
+        "temperature": 0.0,
+        "max_completion_tokens": max_completion_tokens,
+        "response_format": {"type": "json_object"},
+    }
+
+
+async def call_gpt_evaluator(
+    client: AsyncOpenAI,
+    throttle: RequestThrottle,
     prompt: str,
+    max_completion_tokens: int,
     max_retries: int = 3,
-) -> str:
+) -> str | None:
     """
-    Call GPT‑4.1 evaluator and return '0' or '1'.
+    Call GPT‑4.1 evaluator and return its raw text, or None on failure.
 
-    The prompt asks for a JSON list with objects of the form
-    {"question": "...", "met": true/false, "reasoning": "..."}.
-    We parse the first object's "met" field and convert it to 1/0.
+    Requests go through `throttle`; the retry backoff is awaited outside
+    of it so other requests can proceed.
     """
+    # Rough prompt size (~4 characters per token) plus the completion budget.
+    estimated_tokens = len(prompt) // 4 + max_completion_tokens
     for attempt in range(max_retries):
         try:
-            response = client.chat.completions.create(
-                model=EVALUATOR_MODEL,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
-                temperature=0.0,
-                max_completion_tokens=64,
-            )
+            async with throttle.request(estimated_tokens) as reservation:
+                response = await client.chat.completions.create(
+                    **build_evaluator_request(prompt, max_completion_tokens)
+                )
+                if response.usage is not None:
+                    throttle.record_usage(reservation, response.usage.total_tokens)
 
             choice = response.choices[0]
-            text = (choice.message.content or "").strip()
-
-            # First try to parse JSON as specified in the prompt.
-            try:
-                parsed = json.loads(text)
-                if isinstance(parsed, list) and parsed:
-                    first = parsed[0]
-                    if isinstance(first, dict) and "met" in first:
-                        met = first["met"]
-                        # Accept booleans or string "true"/"false"
-                        if isinstance(met, bool):
-                            return "1" if met else "0"
-                        if isinstance(met, str):
-                            lowered = met.strip().lower()
-                            if lowered == "true":
-                                return "1"
-                            if lowered == "false":
-                                return "0"
-            except Exception:
-                # Fall back to heuristic parsing below.
-                pass
-
-            # Fallback: check for 'met' in a non‑JSON answer, or generic true/false.
-            lowered_text = text.lower()
-            if '"met"' in lowered_text:
-                if "true" in lowered_text:
-                    return "1"
-                if "false" in lowered_text:
-                    return "0"
-
-            # Final fallback heuristics similar to yes/no.
-            if "yes" in lowered_text or "satisf" in lowered_text:
-                return "1"
-            if "no" in lowered_text or "not satisf" in lowered_text:
-                return "0"
-
-            print(
-                f"⚠️ Could not parse evaluator output, defaulting to 0. "
-                f"Raw output: {text[:160]!r}"
-            )
-            return "0"
+            return (choice.message.content or "").strip()
 
         except Exception as e:  # noqa: BLE001
             if attempt < max_retries - 1:
                 wait_time = (attempt + 1) * 2
                 print(f"Evaluator call failed, retrying in {wait_time}s... Error: {e}")
-                time.sleep(wait_time)
+                await asyncio.sleep(wait_time)
             else:
                 print(
                     f"Evaluator call failed after {max_retries} attempts, "
                     f"defaulting to 0. Error: {e}"
                 )
-                return "0"
+                return None
 
-    return "0"
+    return None
 
 
-def evaluate_rubric_item(
-    client: OpenAI,
-    criterion: str,
+async def evaluate_rubric_batch(
+    client: AsyncOpenAI,
+    throttle: RequestThrottle,
+    criteria: List[str],
     model_response: str,
     user_query: str,
-) -> int:
-    """Evaluate a single rubric item and return 0 or 1."""
+    cache: EvaluatorCache | None = None,
+) -> List[int | None]:
+    """
+    Evaluate several rubric criteria in one call and return 0/1 per criterion.
+
+    Criteria whose evaluator call failed are returned as None. If the
+    evaluator's answer cannot be parsed into one verdict per criterion, the
+    batch is split in half and each half is retried. Successfully parsed
+    verdicts are written to `cache`.
+    """
     if not model_response or not str(model_response).strip():
-        return 0
-    prompt = create_evaluation_prompt(
-        criterion,
-        str(model_response),
-        user_query,
+        return [0] * len(criteria)
+
+    prompt = create_evaluation_prompt(criteria, str(model_response), user_query)
+    text = await call_gpt_evaluator(
+        client,
+        throttle,
+        prompt,
+        max_completion_tokens=completion_token_budget(len(criteria)),
+    )
+    if text is None:
+        return [None] * len(criteria)
+
+    verdicts = parse_evaluator_output(text, len(criteria))
+    if verdicts is not None:
+        scores = [verdicts[i] for i in range(1, len(criteria) + 1)]
+        if cache is not None:
+            cache.set_many(
+                {
+                    EvaluatorCache.make_key(criterion, model_response, user_query): score
+                    for criterion, score in zip(criteria, scores)
+                }
+            )
+        return scores
+
+    if len(criteria) == 1:
+        return [parse_single_verdict_heuristic(text)]
+
+    print(
+        f"⚠️ Could not parse batched evaluator output for {len(criteria)} "
+        f"criteria, splitting batch."
     )
-    result = call_gpt_evaluator(client, prompt)
-    return int(result)
+    mid = len(criteria) // 2
+    halves = await asyncio.gather(
+        evaluate_rubric_batch(
+            client, throttle, criteria[:mid], model_response, user_query, cache
+        ),
+        evaluate_rubric_batch(
+            client, throttle, criteria[mid:], model_response, user_query, cache
+        ),
+    )
+    return halves[0] + halves[1]
+
+
+def collect_case_criteria(rubric_items: List[Any]) -> List[Tuple[int, str, Any]]:
+    """Return (rubric_idx, criterion, points) for each gradable rubric item."""
+    criteria: List[Tuple[int, str, Any]] = []
+    for rubric_idx, rubric_item in enumerate(rubric_items, 1):
+        if not isinstance(rubric_item, dict):
+            continue
+        criterion = rubric_item.get("criterion", "")
+        if not criterion:
+            continue
+        criteria.append((rubric_idx, criterion, rubric_item.get("points", 0)))
+    return criteria
+
+
+def lookup_known_scores(
+    case_id: Any,
+    criteria: List[Tuple[int, str, Any]],
+    model_response: str,
+    user_query: str,
+    cache: EvaluatorCache | None = None,
+    item_log: RubricItemLog | None = None,
+) -> Dict[int, int]:
+    """
+    Return {rubric_idx: score} for criteria already in `item_log` or `cache`.
+
+    Cache hits are copied into `item_log` so the case can resume from it.
+    """
+    scores: Dict[int, int] = {}
+    for rubric_idx, criterion, _ in criteria:
+        known = item_log.get(case_id, criterion) if item_log is not None else None
+        if known is None and cache is not None:
+            known = cache.get(
+                EvaluatorCache.make_key(criterion, model_response, user_query)
+            )
+            if known is not None and item_log is not None:
+                item_log.append(case_id, rubric_idx, criterion, known)
+        if known is not None:
+            scores[rubric_idx] = known
+    return scores
+
+
+async def evaluate_case(
+    client: AsyncOpenAI,
+    throttle: RequestThrottle,
+    case_id: Any,
+    rubric_items: List[Any],
+    model_response: str,
+    user_query: str,
+    criteria_per_call: int = DEFAULT_CRITERIA_PER_CALL,
+    cache: EvaluatorCache | None = None,
+    item_log: RubricItemLog | None = None,
+) -> Dict[str, Any]:
+    """
+    Evaluate all rubric items of one case, batching criteria per call.
+
+    Criteria already recorded in `item_log` or present in `cache` are not
+    sent to the evaluator. Every newly graded item is appended to
+    `item_log` as soon as its batch returns. Items whose evaluator call
+    failed score 0, are not logged and are marked `"evaluator_error": true`;
+    `--resume` regrades cases with such items (see `has_failed_items`).
+    """
+    criteria = collect_case_criteria(rubric_items)
+    scores = lookup_known_scores(
+        case_id, criteria, model_response, user_query, cache, item_log
+    )
+    pending = [c for c in criteria if c[0] not in scores]
+    failed: Set[int] = set()
+
+    async def run_chunk(chunk: List[Tuple[int, str, Any]]) -> None:
+        chunk_scores = await evaluate_rubric_batch(
+            client,
+            throttle,
+            [criterion for _, criterion, _ in chunk],
+            model_response,
+            user_query,
+            cache,
+        )
+        for (rubric_idx, criterion, _), score in zip(chunk, chunk_scores):
+            if score is None:
+                scores[rubric_idx] = 0
+                failed.add(rubric_idx)
+                continue
+            scores[rubric_idx] = score
+            if item_log is not None:
+                item_log.append(case_id, rubric_idx, criterion, score)
+
+    await asyncio.gather(
+        *(
+            run_chunk(pending[i : i + criteria_per_call])
+            for i in range(0, len(pending), criteria_per_call)
+        )
+    )
+
+    model_evaluations: Dict[str, Any] = {}
+    for rubric_idx, criterion, points in criteria:
+        score = scores[rubric_idx]
+        model_evaluations[f"rubric_{rubric_idx}"] = {
+            "criterion": criterion,
+            "points": points,
+            "score": score,
+            "weighted_score": points * score,
+        }
+        if rubric_idx in failed:
+            model_evaluations[f"rubric_{rubric_idx}"]["evaluator_error"] = True
 
+    return {"case_id": case_id, "evaluations": model_evaluations}
 
-def process_evaluations(
-    client: OpenAI,
+
+def has_failed_items(evaluation: Dict[str, Any]) -> bool:
+    """Whether an evaluated case has items whose evaluator call failed."""
+    items = evaluation.get("evaluations") or {}
+    return any(
+        isinstance(item, dict) and item.get("evaluator_error") for item in items.values()
+    )
+
+
+def prompt_fingerprint(prompt: str) -> str:
+    """Short hash of an evaluator prompt, used to match batch answers to it."""
+    payload = f"{EVALUATOR_MODEL}\x00{prompt}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+async def prefill_with_batch_api(
+    client: AsyncOpenAI,
+    jobs: List[Dict[str, Any]],
+    criteria_per_call: int,
+    item_log: RubricItemLog,
+    state_path: Path,
+    model_result_file: Path,
+    cache: EvaluatorCache | None = None,
+) -> None:
+    """
+    Grade the pending criteria of `jobs` through the OpenAI Batch API.
+
+    Each chunk of ungraded criteria becomes one request line with custom_id
+    "<case_id>:<rubric_idx>-<rubric_idx>-...:<prompt fingerprint>". Parsed
+    verdicts are written to `item_log` (and `cache`), so the live pass that
+    follows only calls the API for requests the batch failed to answer.
+
+    The batch id is written to `state_path` right after submission; if that
+    file already exists, the batch it names is collected instead, so an
+    interrupted run can be recovered by rerunning the same command. A state
+    file saved for another evaluator model or model result file raises
+    RuntimeError, and answers whose fingerprint does not match the prompt
+    that would be sent now are skipped rather than logged or cached.
+    """
+    model_result_id = str(model_result_file.resolve())
+    batch_id: str | None = None
+    if state_path.exists():
+        with state_path.open("r", encoding="utf-8") as f:
+            state = json.load(f)
+        saved = (state.get("evaluator_model"), state.get("model_result_file"))
+        if saved != (EVALUATOR_MODEL, model_result_id):
+            raise RuntimeError(
+                f"{state_path} holds batch {state.get('batch_id')} for evaluator "
+                f"{saved[0]!r} and model results {saved[1]!r}, not "
+                f"{EVALUATOR_MODEL!r} and {model_result_id!r}. Rerun with that "
+                f"--model-result-file to collect it, or delete the file to submit "
+                f"a new batch."
+            )
+        batch_id = state.get("batch_id")
+        print(f"📥 Found batch {batch_id} in {state_path}, collecting it.")
+
+    if batch_id is None:
+        lines: List[str] = []
+        for job in jobs:
+            criteria = collect_case_criteria(job["rubric_items"])
+            known = lookup_known_scores(
+                job["case_id"],
+                criteria,
+                job["model_response"],
+                job["user_query"],
+                cache,
+                item_log,
+            )
+            pending = [c for c in criteria if c[0] not in known]
+            for i in range(0, len(pending), criteria_per_call):
+                chunk = pending[i : i + criteria_per_call]
+                prompt = create_evaluation_prompt(
+                    [criterion for _, criterion, _ in chunk],
+                    job["model_response"],
+                    job["user_query"],
+                )
+                request = {
+                    "custom_id": f"{job['case_id']}:"
+                    + "-".join(str(rubric_idx) for rubric_idx, _, _ in chunk)
+                    + f":{prompt_fingerprint(prompt)}",
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": build_evaluator_request(
+                        prompt, completion_token_budget(len(chunk))
+                    ),
+                }
+                lines.append(json.dumps(request, ensure_ascii=False))
+
+        if not lines:
+            print("✓ Batch API: every criterion is already graded.")
+            return
+
+        batch_file = await client.files.create(
+            file=("evaluator_batch.jsonl", ("\n".join(lines) + "\n").encode("utf-8")),
+            purpose="batch",
+        )
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        batch_id = batch.id
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        with state_path.open("w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "batch_id": batch_id,
+                    "evaluator_model": EVALUATOR_MODEL,
+                    "model_result_file": model_result_id,
+                },
+                f,
+            )
+        print(
+            f"📤 Submitted {len(lines)} evaluator requests as batch {batch_id} "
+            f"(saved to {state_path})."
+        )
+
+    batch = await wait_for_batch(client, batch_id, prefix="    ⏳ Batch ")
+
+    if not batch.output_file_id:
+        print(
+            f"⚠️ Batch {batch_id} ended with status {batch.status!r} and no "
+            f"output; grading live instead."
+        )
+        state_path.unlink()
+        return
+
+    jobs_by_case = {str(job["case_id"]): job for job in jobs}
+    output = await client.files.content(batch.output_file_id)
+    graded_count = 0
+    stale_count = 0
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        head, _, fingerprint = entry["custom_id"].rpartition(":")
+        case_id_str, _, rubric_idxs = head.rpartition(":")
+        job = jobs_by_case.get(case_id_str)
+        response = entry.get("response") or {}
+        if job is None or response.get("status_code") != 200:
+            continue
+
+        criteria_by_idx = {
+            rubric_idx: criterion
+            for rubric_idx, criterion, _ in collect_case_criteria(job["rubric_items"])
+        }
+        chunk = [
+            (int(rubric_idx), criteria_by_idx.get(int(rubric_idx)))
+            for rubric_idx in rubric_idxs.split("-")
+        ]
+        if any(criterion is None for _, criterion in chunk):
+            continue
+        prompt = create_evaluation_prompt(
+            [criterion for _, criterion in chunk],
+            job["model_response"],
+            job["user_query"],
+        )
+        if prompt_fingerprint(prompt) != fingerprint:
+            # Graded against another response, query or criterion text.
+            stale_count += 1
+            continue
+
+        message = response["body"]["choices"][0]["message"]
+        verdicts = parse_evaluator_output((message.get("content") or "").strip(), len(chunk))
+        if verdicts is None:
+            continue
+        for item_id, (rubric_idx, criterion) in enumerate(chunk, 1):
+            item_log.append(job["case_id"], rubric_idx, criterion, verdicts[item_id])
+        if cache is not None:
+            cache.set_many(
+                {
+                    EvaluatorCache.make_key(
+                        criterion, job["model_response"], job["user_query"]
+                    ): verdicts[item_id]
+                    for item_id, (_, criterion) in enumerate(chunk, 1)
+                }
+            )
+        graded_count += len(chunk)
+
+    # The batch's verdicts are logged; a rerun should submit a new batch.
+    state_path.unlink()
+    if stale_count:
+        print(
+            f"⚠️ Skipped {stale_count} batch answer(s) graded against a different "
+            f"model response or rubric than the current files."
+        )
+    print(
+        f"✓ Batch {batch_id} graded {graded_count} rubric item(s); "
+        f"anything unanswered is graded live."
+    )
+
+
+async def process_evaluations_async(
+    client: AsyncOpenAI,
     rubric_file: Path,
     model_result_file: Path,
     output_file: Path,
     response_field: str,
     max_cases: int | None = None,
     resume: bool = False,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_rpm: int = DEFAULT_MAX_RPM,
+    max_tpm: int = DEFAULT_MAX_TPM,
+    criteria_per_call: int = DEFAULT_CRITERIA_PER_CALL,
+    cache: EvaluatorCache | None = None,
+    mode: str = "live",
 ) -> None:
-    """Main evaluation loop."""
+    """
+    Main evaluation loop.
+
+    In "batch" mode, pending criteria are first graded through the OpenAI
+    Batch API (tracked in `<output>.batch.json`); the live pass then only
+    calls the API for anything the batch did not answer.
+    """
     print("=" * 60)
     print(f"LiveMedBench evaluator ({EVALUATOR_MODEL_DISPLAY})")
     print("=" * 60)
@@ -342,12 +946,55 @@ def process_evaluations(
         except Exception as e:  # noqa: BLE001
             print(f"⚠ Failed to load existing evaluations, starting fresh: {e}")
 
+    # Cases finished since the output file was last written.
+    partial_path = output_file.with_suffix(".partial.jsonl")
+    if resume and partial_path.exists():
+        partial = load_jsonl_file(partial_path)
+        for e in partial:
+            if e.get("case_id") is not None:
+                existing_evaluations[str(e["case_id"])] = e
+        print(f"✓ Resume: loaded {len(partial)} evaluated cases from {partial_path}")
+
+    # Cases that scored 0 on a failed evaluator call are graded again.
+    failed_case_ids = [
+        case_id for case_id, e in existing_evaluations.items() if has_failed_items(e)
+    ]
+    for case_id in failed_case_ids:
+        del existing_evaluations[case_id]
+    if failed_case_ids:
+        print(
+            f"✓ Resume: regrading {len(failed_case_ids)} case(s) with failed "
+            f"evaluator calls."
+        )
+
     output_file.parent.mkdir(parents=True, exist_ok=True)
+    partial_fh = open_jsonl_log(partial_path, append=resume)
+
+    item_log = RubricItemLog(output_file.with_suffix(".jsonl"), resume=resume)
+    if resume:
+        print(f"✓ Resume: loaded {len(item_log)} graded rubric items from {item_log.path}")
 
-    results: List[Dict[str, Any]] = []
+    # Results keyed by position in the rubric file, so the output keeps the
+    # rubric order even though cases complete out of order.
+    results: Dict[int, Dict[str, Any]] = {}
     total_cases = len(rubric_data)
     processed_count = 0
 
+    def record_result(idx: int, result: Dict[str, Any]) -> None:
+        results[idx] = result
+        partial_fh.write(json.dumps(result, ensure_ascii=False) + "\n")
+        partial_fh.flush()
+
+    throttle = RequestThrottle(max_concurrency, max_rpm, max_tpm)
+    # (rubric-file position, evaluate_case arguments) for each case to grade.
+    jobs: List[Tuple[int, Dict[str, Any]]] = []
+
+    async def run_case(
+        idx: int,
+        coro: Awaitable[Dict[str, Any]],
+    ) -> Tuple[int, Dict[str, Any]]:
+        return idx, await coro
+
     for idx, case in enumerate(rubric_data):
         if max_cases is not None and processed_count >= max_cases:
             print(f"Reached max_cases={max_cases}, stopping early.")
@@ -365,7 +1012,7 @@ def process_evaluations(
         if not rubric_items:
             print(f"[{idx+1}/{total_cases}] ⚠️ Skip case {case_id_str}: no rubric_items")
             if case_id_str not in existing_evaluations:
-                results.append({"case_id": case_id, "evaluations": {}})
+                record_result(idx, {"case_id": case_id, "evaluations": {}})
             continue
 
         if case_id_str in existing_evaluations:
@@ -374,27 +1021,19 @@ def process_evaluations(
 
         processed_count += 1
         print(
-            f"\n[{idx+1}/{total_cases}] 🔄 Evaluating case: {case_id_str} "
-            f"(new processed: {processed_count})"
+            f"[{idx+1}/{total_cases}] 🔄 Queue case: {case_id_str} "
+            f"({len(rubric_items)} rubric items, new processed: {processed_count})"
         )
-        print(f"    Rubric items: {len(rubric_items)}")
 
         if case_id_str not in model_results:
             print(f"    ⚠️ Model result missing for case_id={case_id_str}")
-            results.append({"case_id": case_id, "evaluations": {}})
+            record_result(idx, {"case_id": case_id, "evaluations": {}})
             continue
 
-        model_case = model_results[case_id_str]
-        model_response = ""
-        if isinstance(model_case, dict):
-            model_response = model_case.get(response_field, "") or ""
-            if not model_response and response_field != "response":
-                # Fallback to 'response' if needed
-                model_response = model_case.get("response", "") or ""
-
+        model_response = model_results[case_id_str]
         if not model_response:
             print(f"    ⚠️ Model response empty for case_id={case_id_str}")
-            results.append({"case_id": case_id, "evaluations": {}})
+            record_result(idx, {"case_id": case_id, "evaluations": {}})
             continue
 
         # Build the user query as narrative + two newlines + core_request,
@@ -403,54 +1042,79 @@ def process_evaluations(
         core_request = case.get("core_request", "") or ""
         user_query = f"{narrative}\n\n{core_request}".strip()
 
-        print(f"    📊 Evaluating {EVALUATOR_MODEL_DISPLAY} on {len(rubric_items)} criteria...")
-        model_evaluations: Dict[str, Any] = {}
-
-        for rubric_idx, rubric_item in enumerate(rubric_items, 1):
-            if not isinstance(rubric_item, dict):
-                continue
-            criterion = rubric_item.get("criterion", "")
-            points = rubric_item.get("points", 0)
-
-            if not criterion:
-                continue
-
-            score = evaluate_rubric_item(
-                client,
-                criterion,
-                model_response,
-                user_query,
+        jobs.append(
+            (
+                idx,
+                {
+                    "case_id": case_id,
+                    "rubric_items": rubric_items,
+                    "model_response": model_response,
+                    "user_query": user_query,
+                },
             )
+        )
 
-            model_evaluations[f"rubric_{rubric_idx}"] = {
-                "criterion": criterion,
-                "points": points,
-                "score": score,
-                "weighted_score": points * score,
-            }
+    if mode == "batch" and jobs:
+        print(f"\n📦 Grading {len(jobs)} case(s) through the OpenAI Batch API...")
+        await prefill_with_batch_api(
+            client,
+            [job for _, job in jobs],
+            criteria_per_call,
+            item_log,
+            output_file.with_suffix(".batch.json"),
+            model_result_file,
+            cache,
+        )
 
-            # Light rate‑limiting on evaluator calls
-            time.sleep(0.2)
+    tasks = [
+        asyncio.create_task(
+            run_case(
+                idx,
+                evaluate_case(
+                    client,
+                    throttle,
+                    **job,
+                    criteria_per_call=criteria_per_call,
+                    cache=cache,
+                    item_log=item_log,
+                ),
+            )
+        )
+        for idx, job in jobs
+    ]
 
-        print("      ✓ Evaluation completed.")
+    print(
+        f"\n📊 Evaluating {len(tasks)} case(s) with {EVALUATOR_MODEL_DISPLAY} "
+        f"(max concurrency: {max_concurrency}, "
+        f"max RPM: {max_rpm}, max TPM: {max_tpm})..."
+    )
 
-        result = {"case_id": case_id, "evaluations": model_evaluations}
-        results.append(result)
+    def ordered_results() -> List[Dict[str, Any]]:
+        return list(existing_evaluations.values()) + [
+            results[i] for i in sorted(results)
+        ]
 
-        if processed_count % 5 == 0:
-            combined = list(existing_evaluations.values()) + results
-            with output_file.open("w", encoding="utf-8") as f:
-                json.dump(combined, f, ensure_ascii=False, indent=2)
-            print(
-                f"\n💾 Saved intermediate results, "
-                f"current progress: {len(combined)}/{total_cases}"
-            )
+    completed_count = 0
+    for next_done in asyncio.as_completed(tasks):
+        idx, result = await next_done
+        record_result(idx, result)
+        completed_count += 1
+        print(
+            f"    ✓ [{completed_count}/{len(tasks)}] Evaluation completed: "
+            f"{result['case_id']} (appended to {partial_path.name})"
+        )
 
     print("\nSaving final results...")
-    final_results = list(existing_evaluations.values()) + results
+    final_results = ordered_results()
     with output_file.open("w", encoding="utf-8") as f:
         json.dump(final_results, f, ensure_ascii=False, indent=2)
 
+    # Every graded item and case is now part of the final output.
+    item_log.close()
+    item_log.path.unlink()
+    partial_fh.close()
+    partial_path.unlink()
+
     print(f"\nDone! Total evaluated cases: {len(final_results)}")
     print(f"Results saved to: {output_file}")
 
@@ -473,22 +1137,39 @@ def main() -> None:
     if args.max_cases is not None:
         print(f"Max cases         : {args.max_cases} (for debugging)")
     print(f"Resume            : {args.resume}")
+    print(f"Max concurrency   : {args.max_concurrency}")
+    print(f"Max RPM / TPM     : {args.max_rpm} / {args.max_tpm}")
+    print(f"Criteria per call : {args.criteria_per_call}")
+    print(f"Verdict cache     : {'disabled' if args.no_cache else args.cache_file}")
+    print(f"Mode              : {args.mode}")
     print("=" * 60)
 
     print("\nInitializing OpenAI evaluator client...")
     client = init_client()
+    cache = None if args.no_cache else EvaluatorCache(Path(args.cache_file))
 
-    process_evaluations(
-        client=client,
-        rubric_file=rubric_path,
-        model_result_file=model_result_path,
-        output_file=output_path,
-        response_field=args.response_field,
-        max_cases=args.max_cases,
-        resume=args.resume,
-    )
+    try:
+        asyncio.run(
+            process_evaluations_async(
+                client=client,
+                rubric_file=rubric_path,
+                model_result_file=model_result_path,
+                output_file=output_path,
+                response_field=args.response_field,
+                max_cases=args.max_cases,
+                resume=args.resume,
+                max_concurrency=args.max_concurrency,
+                max_rpm=args.max_rpm,
+                max_tpm=args.max_tpm,
+                criteria_per_call=args.criteria_per_call,
+                cache=cache,
+                mode=args.mode,
+            )
+        )
+    finally:
+        if cache is not None:
+            cache.close()
 
 
 if __name__ == "__main__":
     main()
-
@@ -23,9 +23,12 @@ import glob
 import json
 import os
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
+
+from common import iter_json_root
 
 
 def parse_args() -> argparse.Namespace:
@@ -105,40 +108,36 @@ def calculate_max_possible_score(rubric_items: List[Dict[str, Any]]) -> float:
     return max_score
 
 
+def build_rubric_criteria(rubric_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Map each non-empty rubric criterion to its points."""
+    rubric_criteria = {}
+    for item in rubric_items:
+        criterion = item.get("criterion", "")
+        if criterion:
+            rubric_criteria[criterion] = item.get("points", 0)
+    return rubric_criteria
+
+
 def calculate_case_total_score(
     evaluations: Dict[str, Any],
-    rubric_items: List[Dict[str, Any]],
+    rubric_criteria: Dict[str, Any],
 ) -> float:
     """
     Compute the total weighted_score for a single case.
 
-    We:
-      - Build a set of valid criteria from the rubric file.
-      - Sum weighted_score for evaluation entries whose criterion appears in
-        the rubric (to stay aligned with the reference rubric).
+    We sum weighted_score for evaluation entries whose criterion appears in
+    `rubric_criteria` (see `build_rubric_criteria`), to stay aligned with
+    the reference rubric.
     """
-    if not evaluations or not rubric_items:
+    if not evaluations or not rubric_criteria:
         return 0.0
 
-    rubric_criteria = {}
-    for item in rubric_items:
-        criterion = item.get("criterion", "")
-        if criterion:
-            rubric_criteria[criterion] = item.get("points", 0)
-
     total_score = 0.0
-
-    for _, rubric_data in evaluations.items():
-        if not isinstance(rubric_data, dict):
-            continue
-        criterion = rubric_data.get("criterion", "")
-        weighted_score = rubric_data.get("weighted_score", 0)
-
-        if not criterion or criterion not in rubric_criteria:
-            continue
-
-        if isinstance(weighted_score, (int, float)):
-            total_score += float(weighted_score)
+    for rubric_data in evaluations.values():
+        if isinstance(rubric_data, dict) and rubric_data.get("criterion") in rubric_criteria:
+            weighted_score = rubric_data.get("weighted_score", 0)
+            if isinstance(weighted_score, (int, float)):
+                total_score += weighted_score
 
     return total_score
 
@@ -155,29 +154,37 @@ def extract_year_month(post_time: str) -> str:
 
 def calculate_model_scores(
     model_name: str,
-    evaluation_data: List[Dict[str, Any]],
+    evaluation_data: Iterable[Dict[str, Any]],
     rubric_mapping: Dict[str, Dict[str, Any]],
 ) -> Dict[str, Dict[str, Any]]:
     """
     Compute per-case normalized scores for one model.
 
+    `rubric_mapping` holds, per case_id, the rubric_criteria,
+    max_possible_score and year_month precomputed once in `main` for all
+    models.
+
     Returns:
         dict: {case_id: {"score": float, "post_time": str, "year_month": str}}
     """
     case_scores: Dict[str, Dict[str, Any]] = {}
 
     for case_eval in evaluation_data:
+        if not isinstance(case_eval, dict):
+            continue
         case_id = case_eval.get("case_id")
         evaluations = case_eval.get("evaluations", {})
         if not case_id or not isinstance(evaluations, dict):
             continue
 
         rubric_info = rubric_mapping.get(str(case_id), {})
-        rubric_items = rubric_info.get("rubric_items", [])
         post_time = rubric_info.get("post_time", "")
 
-        total_score = calculate_case_total_score(evaluations, rubric_items)
-        max_possible_score = calculate_max_possible_score(rubric_items)
+        total_score = calculate_case_total_score(
+            evaluations,
+            rubric_info.get("rubric_criteria", {}),
+        )
+        max_possible_score = rubric_info.get("max_possible_score", 0.0)
 
         if max_possible_score > 0:
             per_example_score = total_score / max_possible_score
@@ -187,12 +194,29 @@ def calculate_model_scores(
         case_scores[case_id] = {
             "score": per_example_score,
             "post_time": post_time,
-            "year_month": extract_year_month(post_time) if post_time else "Unknown",
+            "year_month": rubric_info.get("year_month", "Unknown"),
         }
 
     return case_scores
 
 
+def clipped_mean(score_sum: float, count: float) -> float:
+    """Average of `count` scores summing to `score_sum`, clipped to [0, 1]."""
+    if not count:
+        return 0.0
+    return max(0.0, min(1.0, score_sum / count))
+
+
+def score_model_file(
+    model_name: str,
+    file_path: Path,
+    rubric_mapping: Dict[str, Dict[str, Any]],
+) -> Dict[str, Dict[str, Any]]:
+    """Load one model's evaluation file and compute its per-case scores."""
+    cases = (case for _, case in iter_json_root(file_path))
+    return calculate_model_scores(model_name, cases, rubric_mapping)
+
+
 def main() -> None:
     args = parse_args()
 
@@ -228,68 +252,73 @@ def main() -> None:
         cid = case.get("case_id")
         if cid is None:
             continue
+        rubric_items = case.get("rubric_items", [])
+        # Rubrics are shared by all models, so derive the per-case lookups once.
+        post_time = case.get("post_time", "")
         rubric_mapping[str(cid)] = {
-            "post_time": case.get("post_time", ""),
-            "rubric_items": case.get("rubric_items", []),
+            "post_time": post_time,
+            "year_month": extract_year_month(post_time) if post_time else "Unknown",
+            "rubric_criteria": build_rubric_criteria(rubric_items),
+            "max_possible_score": calculate_max_possible_score(rubric_items),
         }
     print(f"Loaded rubric for {len(rubric_mapping)} cases.")
 
     # Load evaluations and compute per-model case scores
     print("\nLoading evaluation results and computing per-case scores...")
     all_model_scores: Dict[str, Dict[str, Dict[str, Any]]] = {}
-    for model_name, file_path in model_files.items():
-        print(f"  Processing {model_name}...")
-        evaluation_data = load_json_file(file_path)
-        case_scores = calculate_model_scores(model_name, evaluation_data, rubric_mapping)
-        all_model_scores[model_name] = case_scores
-        print(f"    ✓ {len(case_scores)} cases with scores.")
-
-    # Group by year-month
+    max_workers = min(len(model_files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            model_name: executor.submit(
+                score_model_file, model_name, file_path, rubric_mapping
+            )
+            for model_name, file_path in model_files.items()
+        }
+        # Collect in submission order so all_model_scores keeps the
+        # model_files order.
+        for model_name, future in futures.items():
+            case_scores = future.result()
+            all_model_scores[model_name] = case_scores
+            print(f"  ✓ {model_name}: {len(case_scores)} cases with scores.")
+
+    # Group by year-month in a single pass, keeping running sums and counts
     print("\nAggregating scores by year-month...")
-    monthly_scores: Dict[str, Dict[str, List[float]]] = defaultdict(
-        lambda: defaultdict(list)
-    )  # year_month -> model_name -> [scores]
-    monthly_case_counts: Dict[str, int] = defaultdict(int)  # year_month -> count
-
-    all_months = set()
-    for model_scores in all_model_scores.values():
-        for _, score_info in model_scores.items():
-            year_month = score_info["year_month"]
-            if year_month != "Unknown":
-                all_months.add(year_month)
-
-    # Use the first model as reference for counting cases per month
-    first_model_name = next(iter(all_model_scores.keys()))
+    monthly_totals: Dict[str, Dict[str, List[float]]] = defaultdict(
+        lambda: defaultdict(lambda: [0.0, 0])
+    )  # year_month -> model_name -> [score_sum, case_count]
+    overall_totals: Dict[str, List[float]] = {}  # model_name -> [score_sum, case_count]
 
     for model_name, case_scores in all_model_scores.items():
-        for case_id, score_info in case_scores.items():
+        overall = overall_totals.setdefault(model_name, [0.0, 0])
+        for score_info in case_scores.values():
+            score = score_info["score"]
+            overall[0] += score
+            overall[1] += 1
             year_month = score_info["year_month"]
             if year_month == "Unknown":
                 continue
-            monthly_scores[year_month][model_name].append(score_info["score"])
-            if model_name == first_model_name:
-                monthly_case_counts[year_month] += 1
-
-    # Compute monthly averages (clipped to [0, 1])
-    monthly_avg: Dict[str, Dict[str, float]] = defaultdict(dict)
-    for year_month in sorted(all_months):
-        for model_name in model_files.keys():
-            scores = monthly_scores[year_month][model_name]
-            if scores:
-                avg_score = sum(scores) / len(scores)
-                monthly_avg[year_month][model_name] = max(0.0, min(1.0, avg_score))
-            else:
-                monthly_avg[year_month][model_name] = 0.0
-
-    # Compute overall averages per model
-    overall_avgs: Dict[str, float] = {}
-    for model_name, case_scores in all_model_scores.items():
-        all_scores = [info["score"] for info in case_scores.values()]
-        if all_scores:
-            avg = sum(all_scores) / len(all_scores)
-            overall_avgs[model_name] = max(0.0, min(1.0, avg))
-        else:
-            overall_avgs[model_name] = 0.0
+            totals = monthly_totals[year_month][model_name]
+            totals[0] += score
+            totals[1] += 1
+
+    # Use the first model as reference for counting cases per month
+    first_model_name = next(iter(all_model_scores.keys()))
+    monthly_case_counts: Dict[str, int] = {
+        year_month: int(by_model[first_model_name][1])
+        for year_month, by_model in monthly_totals.items()
+    }
+
+    # Compute monthly and overall averages (clipped to [0, 1])
+    monthly_avg: Dict[str, Dict[str, float]] = {
+        year_month: {
+            model_name: clipped_mean(*monthly_totals[year_month][model_name])
+            for model_name in model_files.keys()
+        }
+        for year_month in sorted(monthly_totals)
+    }
+    overall_avgs: Dict[str, float] = {
+        model_name: clipped_mean(*totals) for model_name, totals in overall_totals.items()
+    }
 
     # Write results to TSV
     print(f"\nWriting results to {output_path} ...")
@@ -297,29 +326,20 @@ def main() -> None:
 
     all_model_names = sorted(model_files.keys())
 
-    with output_path.open("w", encoding="utf-8") as f:
-        # Header
-        header = "Date\t" + "\t".join(all_model_names) + "\t# case\n"
-        f.write(header)
-
-        # Monthly rows
-        for year_month in sorted(monthly_avg.keys()):
-            model_scores = monthly_avg[year_month]
-            case_count = monthly_case_counts[year_month]
-
-            score_values = [
-                f"{model_scores.get(model_name, 0.0):.4f}"
-                for model_name in all_model_names
-            ]
-            f.write(f"{year_month}\t" + "\t".join(score_values) + f"\t{case_count}\n")
-
-        # Overall row
-        total_cases = sum(monthly_case_counts.values())
-        overall_values = [
-            f"{overall_avgs.get(model_name, 0.0):.4f}"
-            for model_name in all_model_names
-        ]
-        f.write(f"Overall\t" + "\t".join(overall_values) + f"\t{total_cases}\n")
+    def format_row(label: str, scores: Dict[str, float], case_count: int) -> str:
+        values = "\t".join(f"{scores.get(m, 0.0):.4f}" for m in all_model_names)
+        return f"{label}\t{values}\t{case_count}"
+
+    # Header, one row per month, then the overall row
+    lines = ["Date\t" + "\t".join(all_model_names) + "\t# case"]
+    lines.extend(
+        format_row(year_month, monthly_avg[year_month], monthly_case_counts[year_month])
+        for year_month in sorted(monthly_avg.keys())
+    )
+    total_cases = sum(monthly_case_counts.values())
+    lines.append(format_row("Overall", overall_avgs, total_cases))
+
+    output_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
     # Print summary
     print("\n[Overall statistics]")
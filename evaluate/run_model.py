@@ -33,13 +33,104 @@ Output format (JSON list):
 """
 
 import argparse
+import asyncio
+import hashlib
+import itertools
 import json
 import os
-import time
+import random
+import re
+import textwrap
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-
-from openai import OpenAI
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+import httpx
+from openai import APIStatusError, AsyncOpenAI, RateLimitError
+
+from common import RequestThrottle, iter_json_root, open_jsonl_log, wait_for_batch
+
+try:
+    import h2  # noqa: F401 - optional: lets httpx speak HTTP/2
+except ImportError:  # pragma: no cover - fall back to HTTP/1.1
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
+try:
+    import orjson  # optional: faster JSON encode/decode
+except ImportError:  # pragma: no cover - fall back to json
+    orjson = None
+
+
+# Default number of model requests allowed in flight at once.
+DEFAULT_MAX_PARALLEL_REQUESTS = 16
+
+# Default account limits for the throttle; match them to your OpenAI tier.
+DEFAULT_MAX_RPM = 500
+DEFAULT_MAX_TPM = 500_000
+
+# Completion budget per case; also reserved up front by the throttle.
+MAX_COMPLETION_TOKENS = 2048
+
+# Connection pool shared by all model requests (one HTTP/2 connection
+# multiplexes many of them).
+MAX_CONNECTIONS = 64
+REQUEST_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+# Retry backoff of a chat call: RETRY_BASE_DELAY * 2**attempt seconds,
+# jittered by +/-50%, and never shorter than the server's retry hint
+# (see `server_retry_hint`).
+DEFAULT_MAX_RETRIES = 6
+RETRY_BASE_DELAY = 1.0
+
+# HTTP statuses worth retrying; other 4xx errors fail the case right away.
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+# Durations such as "1s", "6m0s" or "20ms" in x-ratelimit-reset-* headers.
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# SDK-level retries for Batch API file/batch calls; chat calls are retried
+# by `call_chat_model` itself.
+BATCH_SDK_MAX_RETRIES = 2
+
+
+# CJK Unified Ideographs; any match switches the prompt to Chinese.
+_CJK_RE = re.compile("[\u4e00-\u9fff]")
+
+# Answer-only instructions prepended to every prompt.
+_ZH_INSTR = "请直接用中文回答下面的问题，不要给出推理过程或中间步骤。"
+_EN_INSTR = (
+    "IMPORTANT: Provide ONLY the final answer to the following question, "
+    "without any explanation or reasoning steps."
+)
+
+# Instructions for --pack-size prompts that carry several numbered cases.
+_ZH_PACK_INSTR = (
+    "请直接用中文逐一回答下面编号的问题，不要给出推理过程或中间步骤。"
+    '只返回一个 JSON 数组，按相同顺序为每个问题给出一项 {"id": 编号, "answer": "答案"}。'
+)
+_EN_PACK_INSTR = (
+    "IMPORTANT: Answer each numbered question below. Provide ONLY the final "
+    "answer to each question, without any explanation or reasoning steps. "
+    'Return only a JSON array with one {"id": <number>, "answer": "<answer>"} '
+    "per question, in the same order."
+)
+
+# (index in the input, case_id, case, prompt) of a case still to be run.
+PendingCase = Tuple[int, Any, Dict[str, Any], str]
 
 
 def parse_args() -> argparse.Namespace:
@@ -74,24 +165,138 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="If set, resume from an existing output file (by case_id).",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--max-parallel-requests",
+        type=int,
+        default=DEFAULT_MAX_PARALLEL_REQUESTS,
+        help="Maximum number of model requests in flight at once.",
+    )
+    parser.add_argument(
+        "--max-rpm",
+        type=int,
+        default=DEFAULT_MAX_RPM,
+        help="Maximum model requests started per minute.",
+    )
+    parser.add_argument(
+        "--max-tpm",
+        type=int,
+        default=DEFAULT_MAX_TPM,
+        help="Maximum (estimated) tokens per minute across model requests.",
+    )
+    parser.add_argument(
+        "--pack-size",
+        type=int,
+        default=1,
+        help=(
+            "Number of same-language cases sent together in one request "
+            "(default: 1, one case per request). Raise it when requests/minute, "
+            "not tokens/minute, is the bottleneck."
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="If set, neither read nor write the prompt response cache.",
+    )
+    parser.add_argument(
+        "--batch-api",
+        action="store_true",
+        help=(
+            "If set, submit all pending cases through the OpenAI Batch API "
+            "(half price, up to 24h turnaround) and wait for the results."
+        ),
+    )
+    args = parser.parse_args()
+    if args.max_parallel_requests < 1:
+        parser.error("--max-parallel-requests must be at least 1")
+    if args.max_rpm < 1 or args.max_tpm < 1:
+        parser.error("--max-rpm and --max-tpm must be at least 1")
+    if args.pack_size < 1:
+        parser.error("--pack-size must be at least 1")
+    if args.pack_size > 1 and args.batch_api:
+        parser.error("--pack-size is only supported without --batch-api")
+    return args
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON with `orjson` when installed, else `json`."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_line(obj: Any) -> str:
+    """Encode one compact JSON line (no trailing newline), keeping non-ASCII text."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def json_pretty(obj: Any) -> str:
+    """Encode JSON indented by 2 spaces, keeping non-ASCII text."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+def iter_pending_cases(
+    cases: Iterable[Dict[str, Any]],
+    processed_case_ids: Set[Any],
+    counts: Dict[str, int],
+) -> Iterator[PendingCase]:
+    """
+    Yield (index, case_id, case, prompt) for cases not processed yet.
+
+    The prompt is built here, so whichever thread drains this iterator
+    does that work (see `iter_in_thread`). Processed cases are skipped
+    without a log line each; `counts["skipped"]` and `counts["queued"]`
+    tally both kinds for one summary line.
+    """
+    for idx, case in enumerate(cases):
+        case_id = case.get("case_id", f"case_{idx}")
+        if case_id in processed_case_ids:
+            counts["skipped"] += 1
+            continue
+        processed_case_ids.add(case_id)
+        counts["queued"] += 1
+        prompt = create_prompt(
+            case.get("narrative", "") or "", case.get("core_request", "") or ""
+        )
+        yield idx, case_id, case, prompt
 
 
-def load_data(file_path: Path) -> List[Dict[str, Any]]:
-    """Load a JSON list of cases."""
-    with file_path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    if not isinstance(data, list):
-        raise ValueError(f"Expected a list at root of {file_path}, got {type(data)}")
-    return data
+async def iter_in_thread(items: Iterator[Any], chunk_size: int) -> AsyncIterator[Any]:
+    """
+    Drain a blocking iterator in a worker thread, `chunk_size` items at a time.
+
+    Keeps input parsing and prompt building off the event loop.
+    """
+    while True:
+        chunk = await asyncio.to_thread(list, itertools.islice(items, chunk_size))
+        if not chunk:
+            return
+        for item in chunk:
+            yield item
+
+
+def print_resume_summary(counts: Dict[str, int]) -> None:
+    """Print the one-line resume summary from `iter_pending_cases` counts."""
+    print(
+        f"[resume] Skipped {counts['skipped']} already-processed cases; "
+        f"{counts['queued']} queued this run."
+    )
 
 
 def has_chinese(text: str) -> bool:
     """Return True if the text contains any CJK Unified Ideographs."""
-    for ch in text:
-        if "\u4e00" <= ch <= "\u9fff":
-            return True
-    return False
+    return _CJK_RE.search(text) is not None
+
+
+def is_chinese_case(case: Dict[str, Any]) -> bool:
+    """Whether a case gets the Chinese instruction (same test as `create_prompt`)."""
+    return has_chinese(case.get("core_request", "") or "") or has_chinese(
+        case.get("narrative", "") or ""
+    )
 
 
 def create_prompt(narrative: str, core_request: str) -> str:
@@ -101,26 +306,88 @@ def create_prompt(narrative: str, core_request: str) -> str:
     - If the content contains Chinese, we give a short Chinese instruction.
     - Otherwise we give an English instruction.
     """
-    combined_text = f"{narrative}\n\n{core_request}"
-
-    if has_chinese(combined_text):
-        instruction = "请直接用中文回答下面的问题，不要给出推理过程或中间步骤。"
+    # core_request is usually shorter and already tells the language.
+    if has_chinese(core_request) or has_chinese(narrative):
+        instruction = _ZH_INSTR
     else:
-        instruction = (
-            "IMPORTANT: Provide ONLY the final answer to the following question, "
-            "without any explanation or reasoning steps."
-        )
+        instruction = _EN_INSTR
 
-    prompt = f"{instruction}\n\n{narrative}\n\n{core_request}"
-    return prompt
+    return f"{instruction}\n\n{narrative}\n\n{core_request}"
 
 
-def init_client() -> OpenAI:
+def create_packed_prompt(cases: List[Dict[str, Any]]) -> str:
+    """
+    Build one prompt asking for the answers to several numbered cases.
+
+    All cases are expected to share a language; the instruction follows
+    the first one. The answers come back as a JSON array of {id, answer}.
+    """
+    instruction = _ZH_PACK_INSTR if is_chinese_case(cases[0]) else _EN_PACK_INSTR
+    parts = [instruction]
+    for i, case in enumerate(cases, 1):
+        narrative = case.get("narrative", "") or ""
+        core_request = case.get("core_request", "") or ""
+        parts.append(f"{i}. {narrative}\n\n{core_request}")
+    return "\n\n".join(parts)
+
+
+def parse_packed_answers(text: str, n: int) -> Optional[List[str]]:
+    """
+    Split a packed response into `n` answers, in question order.
+
+    Returns None unless the text holds a JSON array with an answer for
+    every id 1..n.
+    """
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end <= start:
+        return None
+    try:
+        items = json_loads(text[start : end + 1])
+    except ValueError:
+        return None
+    if not isinstance(items, list):
+        return None
+
+    answers: Dict[int, str] = {}
+    for item in items:
+        if not isinstance(item, dict) or "answer" not in item:
+            continue
+        try:
+            answers[int(item.get("id"))] = str(item["answer"]).strip()
+        except (TypeError, ValueError):
+            continue
+    if any(i not in answers for i in range(1, n + 1)):
+        return None
+    return [answers[i] for i in range(1, n + 1)]
+
+
+def iter_packs(
+    pending: Iterable[PendingCase],
+    pack_size: int,
+) -> Iterator[List[PendingCase]]:
+    """Group pending cases into packs of up to `pack_size` cases of one language."""
+    buffers: Dict[bool, List[PendingCase]] = {True: [], False: []}
+    for job in pending:
+        buffer = buffers[is_chinese_case(job[2])]
+        buffer.append(job)
+        if len(buffer) >= pack_size:
+            yield buffer[:]
+            buffer.clear()
+    for buffer in buffers.values():
+        if buffer:
+            yield buffer
+
+
+def init_client() -> AsyncOpenAI:
     """
     Initialize the OpenAI client.
 
     The API key is read from environment variable OPENAI_API_KEY.
     We do not hard-code any secrets in this script.
+
+    Requests share one pooled, keep-alive `httpx.AsyncClient` (HTTP/2 when
+    the `h2` package is installed). SDK retries are off because
+    `call_chat_model` retries on its own; close the client when done.
     """
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
@@ -128,134 +395,534 @@ def init_client() -> OpenAI:
             "OPENAI_API_KEY is not set. Please export your key before running:\n"
             "  export OPENAI_API_KEY='sk-...'"
         )
-    return OpenAI(api_key=api_key)
+    http_client = httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_CONNECTIONS,
+        ),
+        timeout=REQUEST_TIMEOUT,
+    )
+    return AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0)
 
 
-def call_chat_model(
-    client: OpenAI,
+def build_chat_request(
     model: str,
     prompt: str,
-    max_retries: int = 3,
-) -> Tuple[Optional[Any], str, str]:
+    max_completion_tokens: int = MAX_COMPLETION_TOKENS,
+) -> Dict[str, Any]:
+    """Chat-completions request body for one case (or one pack of cases)."""
+    return {
+        "model": model,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt,
+            }
+        ],
+        "temperature": 0.0,
+        "max_completion_tokens": max_completion_tokens,
+    }
+
+
+def estimate_request_tokens(
+    prompt: str, max_completion_tokens: int = MAX_COMPLETION_TOKENS
+) -> int:
+    """Rough token count of one request: ~4 chars per token plus the completion budget."""
+    return len(prompt) // 4 + max_completion_tokens
+
+
+class ResponseCache:
+    """
+    Append-only JSONL cache of model responses keyed by (model, prompt).
+
+    Lets duplicate prompts, reruns and resumed runs replay an earlier
+    answer instead of calling the API again. Error responses are not cached.
     """
-    Call an OpenAI chat model and return (raw_response, text, finish_reason).
+
+    def __init__(self, path: Path) -> None:
+        self._entries: Dict[str, Tuple[str, str]] = {}
+        if path.exists():
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json_loads(line)
+                    except ValueError:
+                        continue  # line cut short by an interrupted run
+                    self._entries[entry["key"]] = (entry["text"], entry["finish_reason"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open_jsonl_log(path, append=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        payload = f"{model}\x00{prompt}".encode("utf-8")
+        return hashlib.blake2b(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        return self._entries.get(key)
+
+    def add(self, key: str, model: str, text: str, finish_reason: str) -> None:
+        if finish_reason == "error":
+            return
+        self._entries[key] = (text, finish_reason)
+        entry = {"key": key, "text": text, "finish_reason": finish_reason, "model": model}
+        self._fh.write(json_line(entry) + "\n")
+        self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def server_retry_hint(error: Exception) -> Optional[float]:
+    """
+    Seconds the server asked us to wait, read from the error's response headers.
+
+    retry-after-ms / retry-after are used whenever present. Otherwise, for a
+    RateLimitError only, the x-ratelimit-reset-* duration of the limit that
+    is exhausted (its x-ratelimit-remaining-* is 0) is used. Anything else,
+    such as a 5xx without retry-after, gets no hint and plain backoff.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass  # an HTTP-date retry-after; fall through to the reset headers
+    if not isinstance(error, RateLimitError):
+        return None
+
+    hints: List[float] = []
+    for limit in ("requests", "tokens"):
+        if headers.get(f"x-ratelimit-remaining-{limit}") != "0":
+            continue
+        value = headers.get(f"x-ratelimit-reset-{limit}")
+        if value:
+            hints.append(
+                sum(float(n) * _DURATION_UNITS[unit] for n, unit in _DURATION_RE.findall(value))
+            )
+    return max(hints) if hints else None
+
+
+def retry_delay(attempt: int, error: Exception) -> float:
+    """Jittered exponential backoff for `attempt`, at least the server's hint."""
+    backoff = RETRY_BASE_DELAY * 2**attempt * random.uniform(0.5, 1.5)
+    return max(server_retry_hint(error) or 0.0, backoff)
+
+
+async def call_chat_model(
+    client: AsyncOpenAI,
+    throttle: RequestThrottle,
+    model: str,
+    prompt: str,
+    cache: Optional[ResponseCache] = None,
+    max_completion_tokens: int = MAX_COMPLETION_TOKENS,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> Tuple[str, str]:
+    """
+    Call an OpenAI chat model and return (text, finish_reason).
 
     This uses a simple user-only message. You can extend the system prompt
-    logic here if your experiments require it.
+    logic here if your experiments require it. Each attempt takes one of
+    `throttle`'s concurrency slots and is counted against its RPM/TPM
+    window when it is sent; the retry backoff (see `retry_delay`) is
+    awaited outside it. A `cache` hit returns right away.
     """
+    key = ResponseCache.make_key(model, prompt)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+
+    # Built once; every attempt sends the same request body.
+    request = build_chat_request(model, prompt, max_completion_tokens)
+    estimated_tokens = estimate_request_tokens(prompt, max_completion_tokens)
     for attempt in range(max_retries):
         try:
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
-                temperature=0.0,
-                max_completion_tokens=2048,
-            )
+            async with throttle.request(estimated_tokens) as reservation:
+                response = await client.chat.completions.create(**request)
+                if getattr(response, "usage", None) is not None:
+                    throttle.record_usage(reservation, response.usage.total_tokens)
             choice = response.choices[0]
             content = choice.message.content or ""
             finish_reason = choice.finish_reason or "unknown"
-            return response, content.strip(), finish_reason
+            if cache is not None:
+                cache.add(key, model, content.strip(), finish_reason)
+            return content.strip(), finish_reason
+        except RateLimitError as e:
+            error: Exception = e
+            label = "Rate limited"
+        except APIStatusError as e:
+            if e.status_code < 500 and e.status_code not in RETRYABLE_STATUS_CODES:
+                print(f"API call failed with status {e.status_code}, not retrying: {e}")
+                return f"ERROR: {e}", "error"
+            error = e
+            label = f"API call failed with status {e.status_code}"
         except Exception as e:  # noqa: BLE001 - keep simple for script usage
-            if attempt < max_retries - 1:
-                wait_time = (attempt + 1) * 2
-                print(f"API call failed, retrying in {wait_time}s... Error: {e}")
-                time.sleep(wait_time)
-            else:
-                print(f"API call failed after {max_retries} attempts: {e}")
-                return None, f"ERROR: {e}", "error"
-
-
-def save_results(results: List[Dict[str, Any]], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
-
-
-def process_cases(
-    client: OpenAI,
-    model: str,
-    data: List[Dict[str, Any]],
-    output_path: Path,
-    max_cases: Optional[int] = None,
-    resume: bool = False,
-) -> List[Dict[str, Any]]:
-    """Iterate over all cases and call the model."""
-    results: List[Dict[str, Any]] = []
-    processed_case_ids = set()
-    total = len(data)
+            error = e
+            label = "API call failed"
+
+        if attempt < max_retries - 1:
+            wait_time = retry_delay(attempt, error)
+            print(f"{label}, retrying in {wait_time:.1f}s... Error: {error}")
+            await asyncio.sleep(wait_time)
+        else:
+            print(f"API call failed after {max_retries} attempts: {error}")
+            return f"ERROR: {error}", "error"
+
+
+def append_result(record: Dict[str, Any], fh: TextIO) -> None:
+    """Append one record to the JSONL log and flush it to disk."""
+    fh.write(json_line(record) + "\n")
+    fh.flush()
+
+
+def iter_result_log(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield the JSONL log's records, skipping a line truncated by an interrupted run."""
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json_loads(line)
+            except ValueError:
+                print(f"Warning: skipping malformed line in {path}")
+
+
+def seed_result_log(output_path: Path, jsonl_path: Path) -> None:
+    """Copy the records of an output JSON written without a log into a new log."""
+    try:
+        with jsonl_path.open("w", encoding="utf-8") as fh:
+            for _, record in iter_json_root(output_path):
+                fh.write(json_line(record) + "\n")
+    except Exception:
+        jsonl_path.unlink()
+        raise
+
+
+def load_processed_case_ids(output_path: Path) -> Set[Any]:
+    """
+    case_ids already logged for `output_path`, for `--resume`.
 
-    if resume and output_path.exists():
+    An output JSON written without a log is first copied into a new log.
+    Only the ids are kept; the records stay on disk until consolidation.
+    """
+    jsonl_path = output_path.with_suffix(".jsonl")
+    if not jsonl_path.exists() and output_path.exists():
         try:
-            with output_path.open("r", encoding="utf-8") as f:
-                existing_results = json.load(f)
-            if isinstance(existing_results, list):
-                results = existing_results
-                processed_case_ids = {
-                    r.get("case_id") for r in results if r.get("case_id") is not None
-                }
-                print(
-                    f"[resume] Loaded {len(results)} existing results, "
-                    f"{len(processed_case_ids)} unique case_ids."
-                )
+            seed_result_log(output_path, jsonl_path)
+            print(f"[resume] Copied existing results from {output_path} into {jsonl_path}.")
         except Exception as e:  # noqa: BLE001
             print(f"Warning: failed to load existing results from {output_path}: {e}")
 
-    processed_count = 0
+    processed_case_ids: Set[Any] = set()
+    if not jsonl_path.exists():
+        return processed_case_ids
+
+    logged = 0
+    for record in iter_result_log(jsonl_path):
+        logged += 1
+        case_id = record.get("case_id")
+        if case_id is not None:
+            processed_case_ids.add(case_id)
+    print(
+        f"[resume] Found {logged} logged results, "
+        f"{len(processed_case_ids)} unique case_ids."
+    )
+    return processed_case_ids
 
-    for idx, case in enumerate(data):
-        case_id = case.get("case_id", f"case_{idx}")
-        if case_id in processed_case_ids:
-            print(f"[{idx+1}/{total}] Skip already processed case_id={case_id}")
-            continue
 
-        narrative = case.get("narrative", "") or ""
-        core_request = case.get("core_request", "") or ""
+def consolidate_jsonl_to_json(jsonl_path: Path, output_path: Path) -> int:
+    """
+    Stream the JSONL log into the final pretty-printed JSON list.
+
+    The output has the layout of `json.dump(records, indent=2)`, written
+    one record at a time. Returns the number of records written.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with output_path.open("w", encoding="utf-8") as out:
+        out.write("[")
+        if jsonl_path.exists():
+            for record in iter_result_log(jsonl_path):
+                out.write(",\n" if count else "\n")
+                body = json_pretty(record)
+                out.write(textwrap.indent(body, "  "))
+                count += 1
+        out.write("\n]" if count else "]")
+    return count
+
+
+def build_record(
+    case_id: Any,
+    case: Dict[str, Any],
+    text: str,
+    finish_reason: str,
+) -> Dict[str, Any]:
+    """Output record for one case."""
+    # Do NOT serialize the full raw response object to keep files compact and
+    # avoid potential leakage of internal metadata.
+    return {
+        "case_id": case_id,
+        "post_time": case.get("post_time", ""),
+        "narrative": case.get("narrative", "") or "",
+        "core_request": case.get("core_request", "") or "",
+        "model_response": text,
+        "finish_reason": finish_reason,
+        # Keep original doctor advice if available, useful for downstream eval
+        "doctor_advice": case.get("doctor_advice", ""),
+    }
 
-        processed_count += 1
+
+async def run_batch(
+    client: AsyncOpenAI,
+    model: str,
+    pending: List[PendingCase],
+    state_path: Path,
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Run `pending` cases through the OpenAI Batch API.
+
+    Returns {str(case_id): (text, finish_reason)}. The batch id is written
+    to `state_path` right after submission; if that file already exists,
+    the batch it names is collected instead of submitting a new one, so an
+    interrupted run can be recovered by rerunning the same command. A state
+    file saved for a different model raises RuntimeError rather than
+    logging that model's answers under `model`.
+    """
+    client = client.with_options(max_retries=BATCH_SDK_MAX_RETRIES)
+    batch_id: Optional[str] = None
+    if state_path.exists():
+        with state_path.open("r", encoding="utf-8") as f:
+            state = json.load(f)
+        saved_model = state.get("model")
+        if saved_model is not None and saved_model != model:
+            raise RuntimeError(
+                f"{state_path} holds batch {state.get('batch_id')} for model "
+                f"{saved_model!r}, not {model!r}. Rerun with --model {saved_model} "
+                f"to collect it, or delete the file to submit a new batch."
+            )
+        batch_id = state.get("batch_id")
+        print(f"[batch] Found batch {batch_id} in {state_path}, collecting it.")
+
+    if batch_id is None:
+        lines = []
+        for _, case_id, _, prompt in pending:
+            request = {
+                "custom_id": str(case_id),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": build_chat_request(model, prompt),
+            }
+            lines.append(json_line(request))
+
+        batch_file = await client.files.create(
+            file=("run_model_batch.jsonl", ("\n".join(lines) + "\n").encode("utf-8")),
+            purpose="batch",
+        )
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        batch_id = batch.id
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        with state_path.open("w", encoding="utf-8") as f:
+            json.dump({"batch_id": batch_id, "model": model}, f)
         print(
-            f"[{idx+1}/{total}] Processing case_id={case_id} "
-            f"(new processed: {processed_count})"
+            f"[batch] Submitted {len(lines)} requests as batch {batch_id} "
+            f"(saved to {state_path})."
         )
 
-        prompt = create_prompt(narrative, core_request)
-        raw_resp, text, finish_reason = call_chat_model(client, model, prompt)
-
-        record: Dict[str, Any] = {
-            "case_id": case_id,
-            "post_time": case.get("post_time", ""),
-            "narrative": narrative,
-            "core_request": core_request,
-            "model_response": text,
-            "finish_reason": finish_reason,
-            # Keep original doctor advice if available, useful for downstream eval
-            "doctor_advice": case.get("doctor_advice", ""),
-        }
-        # Do NOT serialize the full raw_resp object to keep files compact and
-        # avoid potential leakage of internal metadata.
-        results.append(record)
-        processed_case_ids.add(case_id)
+    batch = await wait_for_batch(client, batch_id, prefix="[batch] ")
+
+    responses: Dict[str, Tuple[str, str]] = {}
+    if batch.output_file_id:
+        output = await client.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            entry = json_loads(line)
+            response = entry.get("response") or {}
+            if response.get("status_code") == 200:
+                choice = response["body"]["choices"][0]
+                content = choice["message"].get("content") or ""
+                finish_reason = choice.get("finish_reason") or "unknown"
+                responses[entry["custom_id"]] = (content.strip(), finish_reason)
+            else:
+                error = entry.get("error") or response.get("body")
+                responses[entry["custom_id"]] = (f"ERROR: {error}", "error")
 
-        # Periodic checkpointing
-        if processed_count % 1 == 0:
-            save_results(results, output_path)
-            print(
-                f"[checkpoint] Saved {len(results)} results "
-                f"({processed_count} new processed)."
-            )
+    print(
+        f"[batch] {batch_id} finished with status {batch.status!r}: "
+        f"{len(responses)}/{len(pending)} responses."
+    )
+    return responses
+
+
+async def process_cases(
+    client: AsyncOpenAI,
+    model: str,
+    cases: Iterable[Dict[str, Any]],
+    output_path: Path,
+    max_cases: Optional[int] = None,
+    resume: bool = False,
+    processed_case_ids: Optional[Set[Any]] = None,
+    max_parallel_requests: int = DEFAULT_MAX_PARALLEL_REQUESTS,
+    max_rpm: int = DEFAULT_MAX_RPM,
+    max_tpm: int = DEFAULT_MAX_TPM,
+    cache: Optional[ResponseCache] = None,
+    pack_size: int = 1,
+    batch_api: bool = False,
+) -> None:
+    """
+    Call the model on all cases concurrently.
+
+    `cases` is consumed lazily, so only the cases in flight are held in
+    memory (batch mode still collects all pending cases). With `resume`,
+    cases in `processed_case_ids` are skipped; it is loaded from the log
+    when not given. At most `max_parallel_requests` calls are in flight at
+    once, and calls start no faster than `max_rpm` / `max_tpm` allow. With
+    `batch_api`, all pending cases go through one Batch API job instead.
+    With `pack_size` > 1, up to that many same-language cases share one
+    request; a pack whose answers cannot be split falls back to one request
+    per case. Prompts answered before are replayed from `cache` when given.
+    Each finished record is appended to `<output>.jsonl`, the log that
+    `--resume` reads back and `consolidate_jsonl_to_json` turns into the
+    final JSON.
+    """
+    jsonl_path = output_path.with_suffix(".jsonl")
+    if processed_case_ids is None:
+        processed_case_ids = load_processed_case_ids(output_path) if resume else set()
+
+    counts = {"skipped": 0, "queued": 0}
+    pending = itertools.islice(
+        iter_pending_cases(cases, processed_case_ids, counts), max_cases
+    )
 
-        if max_cases is not None and processed_count >= max_cases:
-            print(f"Reached max_cases={max_cases}, stopping early.")
-            break
+    jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+    with open_jsonl_log(jsonl_path, append=resume) as fh:
+        if batch_api:
+            batch_cases: List[PendingCase] = []
+            for job in await asyncio.to_thread(list, pending):
+                _, case_id, case, prompt = job
+                hit = None
+                if cache is not None:
+                    hit = cache.get(ResponseCache.make_key(model, prompt))
+                if hit is not None:
+                    append_result(build_record(case_id, case, *hit), fh)
+                else:
+                    batch_cases.append(job)
+            if resume:
+                print_resume_summary(counts)
+            if not batch_cases:
+                return
+            state_path = output_path.with_suffix(".batch.json")
+            responses = await run_batch(client, model, batch_cases, state_path)
+            for _, case_id, case, prompt in batch_cases:
+                if str(case_id) in responses:
+                    text, finish_reason = responses[str(case_id)]
+                    if cache is not None:
+                        key = ResponseCache.make_key(model, prompt)
+                        cache.add(key, model, text, finish_reason)
+                    append_result(build_record(case_id, case, text, finish_reason), fh)
+            # A recovered batch may not cover every case pending now (e.g. a
+            # different --max-cases); those stay unlogged for the next run.
+            missing = [
+                case_id for _, case_id, _, _ in batch_cases if str(case_id) not in responses
+            ]
+            if missing:
+                print(
+                    f"Warning: {len(missing)} pending case(s) got no answer from the "
+                    f"batch and were not saved (e.g. {missing[:5]}); rerun with "
+                    f"--resume to submit them."
+                )
+            # The batch's results are logged; a rerun should submit a new batch.
+            state_path.unlink()
+            return
+
+        throttle = RequestThrottle(max_parallel_requests, max_rpm, max_tpm)
+        # Packs admitted but not finished; bounds how much input is read ahead.
+        admission = asyncio.Semaphore(2 * max_parallel_requests)
+        in_flight: Set[asyncio.Task] = set()
+        done = 0
+
+        def log_record(case_id: Any, case: Dict[str, Any], text: str, finish_reason: str) -> None:
+            nonlocal done
+            # Checkpoint after every completed case
+            append_result(build_record(case_id, case, text, finish_reason), fh)
+            done += 1
+            print(f"[checkpoint] Logged {done} new results.")
+
+        async def process_one(
+            idx: int, case_id: Any, case: Dict[str, Any], prompt: str
+        ) -> None:
+            print(f"[{idx+1}] Processing case_id={case_id}")
+            text, finish_reason = await call_chat_model(
+                client, throttle, model, prompt, cache
+            )
+            log_record(case_id, case, text, finish_reason)
+
+        async def process_pack(pack: List[PendingCase]) -> None:
+            if len(pack) == 1:
+                await process_one(*pack[0])
+                return
+
+            prompt = create_packed_prompt([case for _, _, case, _ in pack])
+            print(f"Processing pack of {len(pack)}: case_ids={[cid for _, cid, _, _ in pack]}")
+            text, finish_reason = await call_chat_model(
+                client,
+                throttle,
+                model,
+                prompt,
+                cache,
+                max_completion_tokens=MAX_COMPLETION_TOKENS * len(pack),
+            )
+            answers = parse_packed_answers(text, len(pack)) if finish_reason != "error" else None
+            if answers is None:
+                print(f"Warning: could not split pack of {len(pack)}, asking one by one.")
+                outcomes = await asyncio.gather(
+                    *(process_one(*job) for job in pack), return_exceptions=True
+                )
+                for (_, case_id, _, _), outcome in zip(pack, outcomes):
+                    if isinstance(outcome, BaseException):
+                        print(f"Warning: case_id={case_id} failed and was not saved: {outcome!r}")
+                return
+            for (_, case_id, case, _), answer in zip(pack, answers):
+                log_record(case_id, case, answer, finish_reason)
+
+        def on_done(task: asyncio.Task, case_ids: List[Any]) -> None:
+            in_flight.discard(task)
+            admission.release()
+            if not task.cancelled() and task.exception() is not None:
+                print(
+                    f"Warning: case_ids={case_ids} failed and were not saved: "
+                    f"{task.exception()!r}"
+                )
 
-        # Simple rate limiting; adjust for your quota/latency requirements.
-        time.sleep(0.5)
+        # Reading, filtering and prompting the next cases happen in a worker
+        # thread, so the event loop only waits on the API.
+        packs = iter_in_thread(iter_packs(pending, pack_size), max_parallel_requests)
+        async for pack in packs:
+            await admission.acquire()
+            task = asyncio.create_task(process_pack(pack))
+            in_flight.add(task)
+            case_ids = [case_id for _, case_id, _, _ in pack]
+            task.add_done_callback(lambda t, cids=case_ids: on_done(t, cids))
 
-    return results
+        if resume:
+            print_resume_summary(counts)
+        if in_flight:
+            await asyncio.wait(in_flight)
 
 
 def main() -> None:
@@ -273,29 +940,75 @@ def main() -> None:
     if args.max_cases is not None:
         print(f"Max cases   : {args.max_cases} (for debugging)")
     print(f"Resume      : {args.resume}")
+    print(f"Parallelism : {args.max_parallel_requests}")
+    print(f"Rate limits : {args.max_rpm} RPM / {args.max_tpm} TPM")
+    if args.pack_size > 1:
+        print(f"Pack size   : {args.pack_size} cases per request")
+    print(f"Batch API   : {args.batch_api}")
     print("=" * 60)
 
-    print("\nLoading data...")
-    data = load_data(data_path)
-    print(f"Loaded {len(data)} cases.")
+    if not data_path.exists():
+        raise FileNotFoundError(f"Data file not found: {data_path}")
 
     print("\nInitializing OpenAI client...")
     client = init_client()
 
-    print("\nStarting inference...")
-    results = process_cases(
-        client=client,
-        model=args.model,
-        data=data,
-        output_path=output_path,
-        max_cases=args.max_cases,
-        resume=args.resume,
-    )
+    cache_path = output_path.with_suffix(".cache.jsonl")
+    cache: Optional[ResponseCache] = None
+
+    async def run() -> None:
+        nonlocal cache
+
+        async def no_result() -> None:
+            return None
+
+        try:
+            # Rebuilding the resume index and loading the response cache both
+            # read sidecar files; do them side by side off the event loop.
+            print("\nLoading resume index and response cache...")
+            processed_case_ids, cache = await asyncio.gather(
+                asyncio.to_thread(load_processed_case_ids, output_path)
+                if args.resume
+                else no_result(),
+                asyncio.to_thread(ResponseCache, cache_path)
+                if not args.no_cache
+                else no_result(),
+            )
+            if cache is not None:
+                print(f"Response cache: {cache_path} ({len(cache)} entries)")
+
+            print("\nStarting inference...")
+            await process_cases(
+                client=client,
+                model=args.model,
+                cases=(case for _, case in iter_json_root(data_path)),
+                output_path=output_path,
+                max_cases=args.max_cases,
+                resume=args.resume,
+                processed_case_ids=processed_case_ids,
+                max_parallel_requests=args.max_parallel_requests,
+                max_rpm=args.max_rpm,
+                max_tpm=args.max_tpm,
+                cache=cache,
+                pack_size=args.pack_size,
+                batch_api=args.batch_api,
+            )
+        finally:
+            # Close pooled connections on the loop that opened them.
+            await client.close()
+
+    try:
+        asyncio.run(run())
+    finally:
+        if cache is not None:
+            cache.close()
 
     print("\nSaving final results...")
-    save_results(results, output_path)
-    print(f"Done. Total cases written: {len(results)}")
+    jsonl_path = output_path.with_suffix(".jsonl")
+    total_written = consolidate_jsonl_to_json(jsonl_path, output_path)
+    print(f"Done. Total cases written: {total_written}")
     print(f"Results saved to: {output_path}")
+    print(f"Append-only log : {jsonl_path}")
 
 
 if __name__ == "__main__":